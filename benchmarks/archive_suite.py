@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+
+# Time the scan, the cache and the operations on the recording list for synthetic archives
+# (see synthetic_archive.py) of growing size. Every run is appended to the results file,
+# one JSON line per archive size, and compared with the previous run on the same machine.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import dvr_manager as dvr
+
+from openwebif_standin import serve
+from synthetic_archive import generate_archive
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+DVR_MANAGER = os.path.join(BENCHMARKS, os.pardir, "dvr_manager.py")
+SIZES = [1_000, 10_000, 100_000]
+RESULTS_FILE = os.path.join(BENCHMARKS, "results", "archive_suite.jsonl")
+# (label, order by, query type) of the sort radios of the GUI
+SORT_OPTIONS = [
+    ("Title", "groupkey", dvr.QueryType.ATTRIBUTE),
+    ("Fingerprint", "fingerprint", dvr.QueryType.CLUSTER),
+    ("Similar", "similar", dvr.QueryType.CLUSTER),
+    ("Overlap", "overlap", dvr.QueryType.CLUSTER),
+    ("Channel", "epg_channel", dvr.QueryType.ATTRIBUTE),
+    ("Date", "timestamp", dvr.QueryType.ATTRIBUTE),
+    ("Size", "file_size", dvr.QueryType.ATTRIBUTE),
+    ("Duration", "video_duration", dvr.QueryType.ATTRIBUTE),
+    ("drop", "is_dropped", dvr.QueryType.ATTRIBUTE),
+    ("good", "is_good", dvr.QueryType.ATTRIBUTE),
+    ("mastered", "is_mastered", dvr.QueryType.ATTRIBUTE),
+    ("COUNT", "COUNT(*)", dvr.QueryType.AGGREGATE),
+    ("AVG(size)", "AVG(file_size)", dvr.QueryType.AGGREGATE),
+    ("MAX(size)", "MAX(file_size)", dvr.QueryType.AGGREGATE),
+    ("SUM(size)", "SUM(file_size)", dvr.QueryType.AGGREGATE),
+    ("ANY(drop)", "MAX(is_dropped)", dvr.QueryType.AGGREGATE),
+    ("ANY(good)", "MAX(is_good)", dvr.QueryType.AGGREGATE),
+    ("ANY(mastered)", "MAX(is_mastered)", dvr.QueryType.AGGREGATE),
+    ("Resolution", "video_height", dvr.QueryType.ATTRIBUTE),
+]
+# Phases of the loader taken from the instrumentation of the scans
+LOADER_PHASES = ["loader scan", "loader cache lookup", "loader probe", "loader texts", "loader fingerprint", "loader copies"]
+# Timings more than this much slower than in the previous run are regressions,
+# unless they grew by less than the minimum seconds, which is noise
+REGRESSION = 0.2
+REGRESSION_MIN_SECONDS = 0.05
+
+def measure(timings: dict[str, float], name: str, func: Callable[..., Any], *args: Any) -> Any:
+    started = time.perf_counter()
+    result = func(*args)
+    timings[name] = time.perf_counter() - started
+    return result
+
+# Run the refresh batch command on the archive like a cron job would, with the instrumentation on.
+# "cold" starts from an empty database, "warm" finds every recording in it. The files themselves
+# are in the page cache either way, as they were just written. volumes may be URLs of remote directories.
+def measure_scan(timings: dict[str, float], name: str, volumes: list[str], database: str, workers: int) -> None:
+    stats = database + ".stats.json"
+    started = time.perf_counter()
+    subprocess.run([sys.executable, DVR_MANAGER, "refresh", "--database", database, "--stats", stats,
+                    "-j", str(workers), *volumes], check=True, stderr=subprocess.DEVNULL)
+    timings[name] = time.perf_counter() - started
+
+    with open(stats, encoding="utf-8") as f:
+        loader = json.load(f)["timings"]
+    for phase in LOADER_PHASES:
+        if phase in loader:
+            timings[f"{name}: {phase}"] = loader[phase]["total_s"]
+
+# Rows of the recording box without a display to draw them on, kept in lists
+# with the calls of a Tk listbox the GUI makes
+class ListboxStandIn:
+    items: list[Any]
+    colors: list[dict[str, str]]
+    selected: list[bool]
+
+    def __init__(self) -> None:
+        self.items, self.colors, self.selected = [], [], []
+
+    def delete(self, first: Any, last: Any = None) -> None:
+        if first == 0 and last == "end":
+            self.items, self.colors, self.selected = [], [], []
+            return
+        del self.items[first], self.colors[first], self.selected[first]
+
+    def insert(self, index: Any, *items: Any) -> None:
+        index = len(self.items) if index == "end" else index
+        self.items[index:index] = items
+        self.colors[index:index] = [{}] * len(items)
+        self.selected[index:index] = [False] * len(items)
+
+    def itemconfig(self, index: int, **options: str) -> None:
+        self.colors[index] = options
+
+    def selection_set(self, index: int) -> None:
+        self.selected[index] = True
+
+    def curselection(self) -> tuple[int, ...]:
+        return tuple(i for i, selected in enumerate(self.selected) if selected)
+
+    def nearest(self, y: int) -> int:
+        return 0
+
+    def see(self, index: int) -> None:
+        pass
+
+    def yview(self, index: int) -> None:
+        pass
+
+    def config(self, **options: str) -> None:
+        pass
+
+    def update_idletasks(self) -> None:
+        pass
+
+# The elements of the GUI window the functions filling and repainting the recording box use
+class Element:
+    widget: Any
+    listbox: bool
+    Values: list[Any]
+    value: str
+
+    def __init__(self, widget: Any, listbox: bool) -> None:
+        self.widget, self.listbox, self.Values, self.value = widget, listbox, [], ""
+
+    # The selected recordings of a listbox, the text of an input field
+    def get(self) -> Any:
+        if self.listbox:
+            return [self.Values[i] for i in self.widget.curselection()]
+        return self.value
+
+# Put a recording box into the GUI module: a Tk listbox if there is a display, so that the timings
+# include Tk, else the stand-in, which only leaves the work of the GUI functions themselves
+def install_window() -> str:
+    listbox: Any
+    try:
+        listbox, kind = tkinter.Listbox(tkinter.Tk()), "tk"
+    except tkinter.TclError:
+        listbox, kind = ListboxStandIn(), "stand-in"
+    dvr.window = {"recordingBox": Element(listbox, True), "searchInp": Element(ListboxStandIn(), False)}
+    return kind
+
+# Run a GUI function and let Tk lay out the changed rows before the time is taken
+def repaint(func: Callable[..., Any], *args: Any) -> None:
+    func(*args)
+    dvr.window["recordingBox"].widget.update_idletasks()
+
+# Sort the list and refill the recording box, keeping the selection, as the sort radios do
+def resort(order_by: str, query_type: dvr.QueryType) -> None:
+    dvr.sort_recordings(order_by, query_type, dvr.SortOrder.ASC)
+    dvr.gui_refill()
+
+# Filter the recording box by the search field and fill it, as typing into it does
+def search(query: str) -> None:
+    dvr.window["searchInp"].value = query
+    dvr.gui_fill()
+    dvr.gui_fill_rows(len(dvr.window["recordingBox"].Values))
+
+# Load the cache and work on the list as the GUI does, repainting the recording box.
+# Runs in a process of its own, as it fills the global recording list.
+def measure_operations(volumes: list[str], database: str) -> tuple[str, dict[str, float]]:
+    timings: dict[str, float] = {}
+    dvr.db_init(database)
+    cache = measure(timings, "cache load", dvr.db_load_all)
+    directories = measure(timings, "directory index load", dvr.db_load_directories)
+
+    shown = set()
+    for d in volumes:
+        for rec in dvr.indexed_recordings(dvr.location_path(d), directories, cache):
+            if rec.basepath not in shown:
+                shown.add(rec.basepath)
+                dvr.recordings.append(rec)
+                dvr.intervals.add(rec)
+    dvr.statistics.recount(dvr.recordings)
+
+    measure(timings, "ranking reset", dvr.ranking.reset, dvr.recordings)
+    dvr.ranking.set_clusters("fingerprint", {})
+    dvr.ranking.set_clusters("similar", measure(timings, "similar clusters", dvr.db_text_clusters, dvr.TEXT_SIMILARITY,
+                                                    {r.file_basename for r in dvr.recordings}))
+    dvr.ranking.set_clusters("overlap", measure(timings, "overlap clusters", dvr.intervals.clusters))
+
+    for label, order_by, query_type in SORT_OPTIONS:
+        for sort_order in dvr.SortOrder:
+            measure(timings, f"sort {label} {sort_order.name}", dvr.sort_recordings, order_by, query_type, sort_order)
+
+    box = install_window()
+    dvr.sort_recordings("groupkey", dvr.QueryType.ATTRIBUTE, dvr.SortOrder.ASC)
+    measure(timings, "fill first rows", repaint, dvr.gui_fill)
+    measure(timings, "fill all rows", repaint, dvr.gui_fill_rows, len(dvr.recordings))
+
+    selection = dvr.recordings[::2]
+    measure(timings, "mark half good", repaint, dvr.update_attribute, selection,
+            lambda r: not r.is_good, lambda r: setattr(r, "is_good", True))
+    measure(timings, "unmark half good", repaint, dvr.update_attribute, selection,
+            lambda r: r.is_good, lambda r: setattr(r, "is_good", False))
+    measure(timings, "refill by date keeping half selected", repaint, resort, "timestamp", dvr.QueryType.ATTRIBUTE)
+    measure(timings, "search", repaint, search, "Krimi")
+    measure(timings, "clear search", repaint, search, "")
+    measure(timings, "mark tenth drop", repaint, dvr.update_attribute, dvr.recordings[::10],
+            lambda r: not r.is_mastered, lambda r: setattr(r, "is_dropped", True))
+    measure(timings, "drop", repaint, drop, dvr.recordings)
+
+    return box, timings
+
+# What the Drop button does
+def drop(recs: list[dvr.Recording]) -> None:
+    for_deletion = [r for r in recs if r.is_dropped]
+    dvr.drop_recordings(for_deletion)
+    for r in for_deletion:
+        dvr.intervals.remove(r)
+        group = dvr.copies.pop(r.basepath, [])
+        if r.basepath in group:
+            group.remove(r.basepath)
+    recs[:] = [r for r in recs if not r.is_dropped]
+    dvr.ranking.reset(recs)
+    dvr.statistics.recount(recs)
+    dvr.ranking.set_clusters("similar", dvr.db_text_clusters(dvr.TEXT_SIMILARITY, {r.file_basename for r in recs}))
+    dvr.ranking.set_clusters("overlap", dvr.intervals.clusters())
+    dvr.gui_fill()
+
+def remove_database(path: str) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+# The kind of recording box and the timings of an archive of the given size
+def run(size: int, workdir: str, workers: int) -> tuple[str, dict[str, float]]:
+    root = os.path.join(workdir, f"archive-{size}")
+    if os.path.isdir(root):
+        volumes = sorted(os.path.join(root, v) for v in os.listdir(root))
+    else:
+        volumes = generate_archive(root, size)
+
+    database = os.path.join(workdir, f"recordings-{size}.sqlite3")
+    remove_database(database)
+
+    timings: dict[str, float] = {}
+    measure_scan(timings, "cold scan", volumes, database, workers)
+    measure_scan(timings, "warm scan", volumes, database, workers)
+
+    # The same archive listed by the OpenWebif of a receiver
+    server = serve(root)
+    remote_database = os.path.join(workdir, f"recordings-{size}-remote.sqlite3")
+    remove_database(remote_database)
+    measure_scan(timings, "remote cold scan", [server.url() + v for v in volumes], remote_database, workers)
+    measure_scan(timings, "remote warm scan", [server.url() + v for v in volumes], remote_database, workers)
+    server.shutdown()
+
+    # The dropped file is written to the working directory
+    os.chdir(workdir)
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        box, operations = pool.submit(measure_operations, volumes, database).result()
+    timings.update(operations)
+
+    return box, timings
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "-C", BENCHMARKS, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+# The last stored result of the same size on this machine, with the same kind of recording box
+def previous_result(path: str, size: int, box: str) -> Optional[dict[str, Any]]:
+    previous = None
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                result = json.loads(line)
+                if result["size"] == size and result["machine"] == platform.node() and result.get("recording box") == box:
+                    previous = result
+    except FileNotFoundError:
+        pass
+    return previous
+
+# The timings slower than in the previous run by more than REGRESSION
+def regressions(result: dict[str, Any], previous: Optional[dict[str, Any]]) -> list[str]:
+    if previous is None:
+        return []
+    return [name for name, seconds in result["timings"].items()
+            if name in previous["timings"] and seconds > previous["timings"][name] * (1 + REGRESSION)
+            and seconds - previous["timings"][name] >= REGRESSION_MIN_SECONDS]
+
+def print_result(result: dict[str, Any], previous: Optional[dict[str, Any]]) -> None:
+    print(f"{result['size']} recordings, {result['recording box']} recording box (commit {result['commit'] or '?'}"
+          f"{'' if previous is None else ', previous run ' + (previous['commit'] or '?') + ' of ' + previous['date']})")
+    print(f"{'':<36} {'seconds':>9} {'previous':>9} {'change':>7}")
+    for name, seconds in result["timings"].items():
+        before = None if previous is None else previous["timings"].get(name)
+        change = f"{(seconds / before - 1) * 100:+6.0f}%" if before else ""
+        marker = "  REGRESSION" if name in result["regressions"] else ""
+        print(f"{name:<36} {seconds:9.3f} {'' if before is None else f'{before:9.3f}':>9} {change:>7}{marker}")
+    if len(result["regressions"]) > 0:
+        print(f"{len(result['regressions'])} timing(s) more than {REGRESSION:.0%} slower than in the previous run")
+    print()
+
+def main(argc: int, argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog=argv[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help=f"numbers of recordings of the archives (default: {' '.join(map(str, SIZES))})")
+    parser.add_argument("--workdir", help="keep the archives in this directory and reuse them on later runs "
+                                          "(default: a temporary directory)")
+    parser.add_argument("-j", "--workers", type=int, default=dvr.INGEST_WORKERS,
+                        help="number of processes probing new recordings (default: one per CPU)")
+    parser.add_argument("--results", default=RESULTS_FILE, metavar="PATH",
+                        help="file the results are appended to (default: results/archive_suite.jsonl)")
+    args = parser.parse_args(argv[1:argc])
+
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="dvr-benchmark-")
+    os.makedirs(workdir, exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+
+    for size in args.sizes:
+        box, timings = run(size, workdir, args.workers)
+        result = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "machine": platform.node(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "workers": args.workers,
+            "size": size,
+            "recording box": box,
+            "timings": timings,
+        }
+        previous = previous_result(args.results, size, box)
+        # Kept with the result, so that a regression stays visible in the results file
+        result["regressions"] = regressions(result, previous)
+        print_result(result, previous)
+        with open(args.results, "a", encoding="utf-8") as f:
+            print(json.dumps(result, ensure_ascii=False), file=f)
+
+if __name__ == "__main__":
+    main(len(sys.argv), sys.argv)
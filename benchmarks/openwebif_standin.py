@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+# A stand-in for the OpenWebif of a receiver, to test and measure remote directories without one.
+# It answers /api/movielist for the directories below a local root (e.g. an archive of synthetic_archive.py)
+# with the movie list built from the .ts.meta files, as the receiver does, over keep-alive HTTP/1.1.
+# Lists carry an ETag and are answered with 304 Not Modified if the client already has the current one.
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from dvr_manager import E2_META_EXTENSION, E2_VIDEO_EXTENSION
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    root: str
+    # Seconds every request takes in addition, as a receiver on the network would
+    delay: float
+    # Requests answered on a connection before it is closed without notice,
+    # as a receiver closing idle connections does (0: kept open)
+    keep_alive: int
+    connections: int
+    requests: int
+    not_modified: int
+    lock: threading.Lock
+
+    def __init__(self, address: tuple[str, int], root: str, delay: float = 0, keep_alive: int = 0) -> None:
+        super().__init__(address, MovieListHandler)
+        self.root, self.delay, self.keep_alive = os.path.abspath(root), delay, keep_alive
+        self.connections, self.requests, self.not_modified = 0, 0, 0
+        self.lock = threading.Lock()
+
+    def url(self) -> str:
+        host, port = self.socket.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+class MovieListHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandInServer
+    answered: int
+
+    def setup(self) -> None:
+        super().setup()
+        self.answered = 0
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.delay)
+
+        url = urllib.parse.urlsplit(self.path)
+        dirname = os.path.normpath(urllib.parse.parse_qs(url.query).get("dirname", [self.server.root])[0])
+        if url.path != "/api/movielist":
+            self.reply(404, b"")
+            return
+        if os.path.commonpath([dirname, self.server.root]) != self.server.root or not os.path.isdir(dirname):
+            self.reply(200, json.dumps({"result": False, "message": f"{dirname} not found"}).encode("utf-8"))
+            return
+
+        etag = list_tag(dirname)
+        if self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.not_modified += 1
+            self.reply(304, b"", etag)
+            return
+        self.reply(200, json.dumps(movie_list(dirname), ensure_ascii=False).encode("utf-8"), etag)
+
+    def reply(self, status: int, body: bytes, etag: str = "") -> None:
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+        self.answered += 1
+        if self.answered == self.server.keep_alive:
+            self.close_connection = True
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+# The entity tag of the movie list of a directory, from the names, sizes and mtimes of its entries
+def list_tag(dirname: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with os.scandir(dirname) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            st = entry.stat()
+            h.update(f"{entry.name}\0{st.st_size}\0{st.st_mtime_ns}\0".encode("utf-8", "surrogateescape"))
+    return f'"{h.hexdigest()}"'
+
+def movie_list(dirname: str) -> dict[str, object]:
+    bookmarks, movies = [], []
+    with os.scandir(dirname) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir():
+                bookmarks.append(entry.name)
+            elif entry.name.endswith(E2_VIDEO_EXTENSION) and entry.is_file():
+                movies.append(movie(entry.path))
+    return {"result": True, "directory": os.path.join(dirname, ""), "bookmarks": bookmarks, "movies": movies}
+
+# The fields of a movie as OpenWebif lists them
+def movie(filepath: str) -> dict[str, object]:
+    meta = ["", "", "", "0", "", "0"]
+    try:
+        with open(filepath[:-len(E2_VIDEO_EXTENSION)] + E2_META_EXTENSION, encoding="utf-8") as f:
+            meta = [line.rstrip("\n") for line in f] + meta[len(meta):]
+    except FileNotFoundError:
+        pass
+    recording_time = int(meta[3]) if meta[3].isdigit() else 0
+    # The length is stored in 90 kHz PTS ticks
+    length = int(meta[5]) // 90_000 if meta[5].isdigit() else 0
+    size = os.path.getsize(filepath)
+    return {
+        "filename": filepath,
+        "fullname": f"1:0:0:0:0:0:0:0:0:0:{filepath}",
+        "serviceref": meta[0],
+        "servicename": meta[0].split(":")[-1].strip(),
+        "eventname": meta[1],
+        "description": meta[2],
+        "descriptionExtended": "",
+        "tags": meta[4],
+        "recordingtime": recording_time,
+        "begintime": datetime.fromtimestamp(recording_time).strftime("%a %d.%m.%Y %H:%M"),
+        "length": f"{length // 60}:{length % 60:02d}",
+        "filesize": size,
+        "filesize_readable": f"{size / 1024 ** 3:.1f} GB",
+        "lastseen": 0,
+    }
+
+# Serve the movie lists below root in a background thread, on a free port unless one is given
+def serve(root: str, port: int = 0, delay: float = 0, keep_alive: int = 0) -> StandInServer:
+    server = StandInServer(("127.0.0.1", port), root, delay, keep_alive)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argc: int, argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog=argv[0])
+    parser.add_argument("root", help="directory whose recordings are listed")
+    parser.add_argument("-p", "--port", type=int, default=8001, help="port to listen on (default: 8001)")
+    parser.add_argument("--delay", type=float, default=0, metavar="SECONDS",
+                        help="time every request takes in addition, as on a network (default: 0)")
+    args = parser.parse_args(argv[1:argc])
+
+    server = serve(args.root, args.port, args.delay)
+    print(f"Serving the movie lists below {server.root}, e.g. {server.url()}{server.root}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    print(f"{server.requests} requests ({server.not_modified} not modified) on {server.connections} connections", file=sys.stderr)
+
+if __name__ == "__main__":
+    main(len(sys.argv), sys.argv)
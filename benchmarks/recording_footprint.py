@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+# Compare memory and row rendering time of the Recording class
+# with the plain class it replaced (one __dict__ per instance, no row cache)
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from dvr_manager import fit_string, make_groupkey, to_GiB, Recording
+
+class LegacyRecording:
+    basepath: str
+    file_basename: str
+    file_size: int
+    file_mtime_ns: int
+    file_inode: int
+    epg_channel: str
+    epg_title: str
+    epg_description: str
+    video_duration: int
+    video_height: int
+    video_width: int
+    video_fps: int
+    is_good: bool
+    is_dropped: bool
+    is_mastered: bool
+    groupkey: str
+    comment: str
+    timestamp: str
+
+    def __attributes(self) -> str:
+        return f"{'D' if self.is_dropped else '.'}{'G' if self.is_good else '.'}{'M' if self.is_mastered else '.'}{'C' if len(self.comment) > 0 else '.'}"
+
+    def __endtime(self) -> str:
+        dt = datetime.strptime(self.timestamp, "%Y-%m-%d %H:%M")
+        dt += timedelta(seconds=self.video_duration)
+
+        return datetime.strftime(dt ,"%H:%M")
+
+    def __repr__(self) -> str:
+        return f"{self.__attributes()} | {self.timestamp} - {self.__endtime()} | {(to_GiB(self.file_size)):4.1f} GiB | {(self.video_duration // 60):3d}' | {fit_string(self.epg_channel, 10, 2).ljust(10)} | {fit_string(self.epg_title, 45, 7).ljust(45)} | {self.epg_description}"
+
+CHANNELS = ["Das Erste HD", "ZDF HD", "arte HD", "3sat HD", "ONE HD", "ZDFneo HD", "tagesschau24 HD", "phoenix HD"]
+TITLES = [f"Series {i}" for i in range(200)] + [f"Movie {i}" for i in range(2000)]
+
+# Build recordings like the cache loader does, every string coming from a separate row
+def make_recordings(cls: type, n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    recs = []
+    for i in range(n):
+        rec = cls()
+        channel, title = "".join(rng.choice(CHANNELS)), "".join(rng.choice(TITLES))
+        rec.basepath = f"/mnt/hdd/dvr/20230101 2015 - {channel} - {title} {i}"
+        rec.file_basename = os.path.basename(rec.basepath)
+        rec.file_size, rec.file_mtime_ns, rec.file_inode = rng.randint(1 << 29, 1 << 33), i, i
+        rec.epg_channel, rec.epg_title = channel, title
+        rec.epg_description = f"Episode {i}: " + "lorem ipsum " * rng.randint(2, 20)
+        rec.video_duration, rec.video_height, rec.video_width, rec.video_fps = rng.randint(600, 9000), 1080, 1920, 25
+        rec.is_good, rec.is_dropped, rec.is_mastered = False, False, False
+        rec.groupkey = make_groupkey(title)
+        rec.comment = ""
+        rec.timestamp = f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"
+        if hasattr(rec, "intern"):
+            rec.intern()
+        recs.append(rec)
+    return recs
+
+def measure(cls: type, n: int) -> tuple[float, float, float]:
+    tracemalloc.start()
+    recs = make_recordings(cls, n)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # The recording box renders every row again whenever it is refilled
+    renders = []
+    for _ in range(2):
+        start = time.perf_counter()
+        for r in recs:
+            repr(r)
+        renders.append(time.perf_counter() - start)
+
+    return memory / n, renders[0], renders[1]
+
+def main(argc: int, argv: list[str]) -> None:
+    n = int(argv[1]) if argc > 1 else 100_000
+
+    print(f"{n} recordings")
+    print(f"{'class':<16} {'bytes/rec':>10} {'1st render':>11} {'2nd render':>11}")
+    for cls in (LegacyRecording, Recording):
+        memory, first, second = measure(cls, n)
+        print(f"{cls.__name__:<16} {memory:10.0f} {first:10.3f}s {second:10.3f}s")
+
+if __name__ == "__main__":
+    main(len(sys.argv), sys.argv)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+
+# Build a synthetic Enigma2 recording archive to measure the scan, the cache and the GUI against.
+# Every recording gets a transport stream that the prober reads without cv2 (PAT, PMT, a video
+# PES with an MPEG-2 sequence header or H.264 SPS and PCRs at both ends), a .ts.meta file in the
+# format of the receiver and the other sidecars of E2_EXTENSIONS. Video files are sparse: the packets
+# at their start and end enclose a hole of the size a real recording of that length would have.
+
+import argparse
+import os
+import random
+import struct
+import sys
+import zlib
+
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from dvr_manager import E2_AP_EXTENSION, E2_META_EXTENSION, E2_VIDEO_EXTENSION, TS_PACKET_SIZE, TS_SYNC_BYTE
+
+# (name, HD) of the channels; HD channels are H.264 1080p, the others MPEG-2 576i, all with 25 fps
+CHANNELS = [("Das Erste HD", True), ("ZDF HD", True), ("arte HD", True), ("3sat HD", True), ("ONE HD", True),
+            ("ZDFneo HD", True), ("tagesschau24 HD", True), ("phoenix HD", True), ("BR Fernsehen", False),
+            ("hr-fernsehen", False), ("MDR Sachsen", False), ("SWR BW", False), ("WDR Köln", False), ("KiKA", False)]
+# Average bytes per second of the video files (8 and 4 MBit/s)
+BYTE_RATE = {True: 1_000_000, False: 500_000}
+# Frequent words of the EPG texts, the others are made up from syllables (see make_vocabulary)
+WORDS = ("der die das und ein eine Krimi Film Dokumentation Reise durch Welt Geschichte Leben Familie Stadt "
+         "Nacht Sommer Winter Liebe Mord Geheimnis Insel Berge Meer Zeit Spur Tod letzte große kleine "
+         "neue alte Haus Kommissar Ärzte Küche Natur Tiere Wissen Abenteuer Flucht Rückkehr Schatten").split()
+SYLLABLES = (["b", "br", "d", "f", "g", "h", "k", "kl", "l", "m", "n", "p", "r", "s", "sch", "st", "t", "w", "z"],
+             ["a", "e", "i", "o", "u", "ä", "ö", "ü", "ei", "au"],
+             ["", "", "n", "r", "s", "t", "ch", "ng", "ll"])
+VOCABULARY_SIZE = 20_000
+VIDEO_PID, PMT_PID, NULL_PID = 0x101, 0x100, 0x1fff
+PTS_START = 0x100000000
+
+# A recording of the archive
+class Programme:
+    channel: str
+    hd: bool
+    start: datetime
+    duration: int
+    title: str
+    description: str
+
+    def __init__(self, channel: str, hd: bool, start: datetime, duration: int, title: str, description: str) -> None:
+        self.channel, self.hd, self.start, self.duration = channel, hd, start, duration
+        self.title, self.description = title, description
+
+    def basename(self) -> str:
+        return f"{self.start:%Y%m%d %H%M} - {self.channel} - {self.title}"
+
+# CRC-32 of MPEG-2 PSI sections (polynomial 0x04c11db7, not reflected)
+def crc32_mpeg(data: bytes) -> int:
+    crc = 0xffffffff
+    for byte in data:
+        crc ^= byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04c11db7 if crc & 0x80000000 else crc << 1) & 0xffffffff
+    return crc
+
+# A single packet, stuffed with an adaptation field if the payload does not fill it.
+# payload must leave room for the PCR if one is given.
+def ts_packet(pid: int, payload: bytes, pusi: bool = False, pcr: int = -1, cc: int = 0) -> bytes:
+    fill = TS_PACKET_SIZE - 4 - len(payload)
+    control = 0x10 if len(payload) > 0 else 0x00
+    adaptation = b""
+    if pcr >= 0 or fill > 0:
+        control |= 0x20
+        if fill == 1:
+            adaptation = b"\x00"
+        else:
+            fields = (bytes([0x10]) + ((pcr << 15) | 0x7e00).to_bytes(6, "big")) if pcr >= 0 else b"\x00"
+            adaptation = bytes([fill - 1]) + fields + b"\xff" * (fill - 1 - len(fields))
+    header = bytes([TS_SYNC_BYTE, (0x40 if pusi else 0) | (pid >> 8), pid & 0xff, control | (cc & 0x0f)])
+    return header + adaptation + payload
+
+# PES packets split into transport stream packets, the first packet of each carrying its PCR (if any)
+def ts_pes_packets(pid: int, pes_pcrs: list[tuple[bytes, int]]) -> bytes:
+    packets: list[bytes] = []
+    for pes, pcr in pes_pcrs:
+        first = True
+        while len(pes) > 0:
+            room = TS_PACKET_SIZE - 4 - (8 if first and pcr >= 0 else 0)
+            packets.append(ts_packet(pid, pes[:room], first, pcr if first else -1, len(packets)))
+            pes, first = pes[room:], False
+    return b"".join(packets)
+
+def psi_packet(pid: int, table_id: int, extension: int, body: bytes) -> bytes:
+    section = bytes([table_id]) + struct.pack(">HHBBB", 0xb000 | (len(body) + 9), extension, 0xc1, 0, 0) + body
+    return ts_packet(pid, b"\x00" + section + struct.pack(">I", crc32_mpeg(section)), pusi=True)
+
+def pes_packet(pts: int, es: bytes) -> bytes:
+    return b"\x00\x00\x01\xe0\x00\x00\x80\x80\x05" + bytes([
+        0x21 | ((pts >> 29) & 0x0e), (pts >> 22) & 0xff, ((pts >> 14) & 0xfe) | 1, (pts >> 7) & 0xff, ((pts << 1) & 0xfe) | 1]) + es
+
+# Writes Exp-Golomb coded syntax elements of an SPS
+class BitWriter:
+    bits: list[int]
+
+    def __init__(self) -> None:
+        self.bits = []
+
+    def u(self, bits: int, value: int) -> None:
+        self.bits += [(value >> (bits - 1 - i)) & 1 for i in range(bits)]
+
+    def ue(self, value: int) -> None:
+        value += 1
+        self.u(value.bit_length() - 1, 0)
+        self.u(value.bit_length(), value)
+
+    # RBSP with trailing bits and emulation prevention bytes
+    def nal_payload(self) -> bytes:
+        bits = self.bits + [1] + [0] * (-(len(self.bits) + 1) % 8)
+        raw = bytes(int("".join(map(str, bits[i:i + 8])), 2) for i in range(0, len(bits), 8))
+        out, zeros = bytearray(), 0
+        for byte in raw:
+            if zeros >= 2 and byte <= 3:
+                out.append(3)
+                zeros = 0
+            out.append(byte)
+            zeros = zeros + 1 if byte == 0 else 0
+        return bytes(out)
+
+# H.264 High profile SPS of a progressive frame size with VUI timing (ITU-T H.264 7.3.2.1.1)
+def h264_sps(width: int, height: int, fps: int) -> bytes:
+    b = BitWriter()
+    b.u(8, 100)
+    b.u(16, 40)
+    b.ue(0)
+    for value in (1, 0, 0):  # chroma_format_idc, bit depths
+        b.ue(value)
+    b.u(2, 0)
+    for value in (0, 0, 4, 0):  # log2_max_frame_num_minus4, pic_order_cnt_type, its lsb, max_num_ref_frames
+        b.ue(value)
+    b.u(1, 0)
+    width_mbs, height_mbs = (width + 15) // 16, (height + 15) // 16
+    b.ue(width_mbs - 1)
+    b.ue(height_mbs - 1)
+    b.u(2, 0b11)
+    cropped = width_mbs * 16 != width or height_mbs * 16 != height
+    b.u(1, cropped)
+    if cropped:
+        for value in (0, (width_mbs * 16 - width) // 2, 0, (height_mbs * 16 - height) // 2):
+            b.ue(value)
+    b.u(6, 0b100001)  # VUI with timing info only
+    b.u(32, 1)
+    b.u(32, 2 * fps)
+    b.u(1, 1)
+    b.u(4, 0)
+    return b"\x00\x00\x00\x01\x67" + b.nal_payload()
+
+# Start of the video file: PAT, PMT and two video PES packets, the first with the sequence header
+# (or SPS and PPS) and an I-frame, followed by a null packet making the file unique
+def ts_head(hd: bool, unique: bytes) -> bytes:
+    pat = psi_packet(0, 0x00, 1, struct.pack(">HH", 1, 0xe000 | PMT_PID))
+    pmt = psi_packet(PMT_PID, 0x02, 1, struct.pack(">HH", 0xe000 | VIDEO_PID, 0xf000)
+                     + struct.pack(">BHH", 0x1b if hd else 0x02, 0xe000 | VIDEO_PID, 0xf000))
+    if hd:
+        header, picture = h264_sps(1920, 1080, 25) + b"\x00\x00\x00\x01\x68\xce\x38\x80", b"\x00\x00\x00\x01\x65"
+    else:
+        header, picture = b"\x00\x00\x01\xb3" + bytes([720 >> 4, ((720 & 15) << 4) | (576 >> 8), 576 & 0xff, 0x33, 0xff, 0xff, 0xe0, 0x18]), b"\x00\x00\x01\x00"
+    video = ts_pes_packets(VIDEO_PID, [(pes_packet(PTS_START, header + picture + bytes(range(256)) * 5), PTS_START),
+                                       (pes_packet(PTS_START + 3600, picture + bytes(64)), -1)])
+    return pat + pmt + video + ts_packet(NULL_PID, unique[:TS_PACKET_SIZE - 4])
+
+# End of the video file: a null packet making the file unique and the last PCR
+def ts_tail(duration: int, unique: bytes) -> bytes:
+    return ts_packet(NULL_PID, unique[:TS_PACKET_SIZE - 4]) + ts_packet(VIDEO_PID, b"", pcr=(PTS_START + duration * 90_000) % (1 << 33))
+
+# DVB event information of the recording (EN 300 468 5.2.4) with a short event descriptor
+def eit_event(p: Programme) -> bytes:
+    # The descriptor holds at most 255 bytes
+    name = b"\x15" + p.title.encode("utf-8")[:80]
+    text = b"\x15" + p.description.encode("utf-8")[:250 - len(name) - 6]
+    descriptor = b"deu" + bytes([len(name)]) + name + bytes([len(text)]) + text
+    descriptor = bytes([0x4d, len(descriptor)]) + descriptor
+    mjd = (p.start.date() - datetime(1858, 11, 17).date()).days
+    hours, rest = divmod(p.duration, 3600)
+    times = [p.start.hour, p.start.minute, p.start.second, hours, rest // 60, rest % 60]
+    return (struct.pack(">HH", 1, mjd) + bytes((t // 10) << 4 | t % 10 for t in times)
+            + struct.pack(">H", 0x8000 | len(descriptor)) + descriptor)
+
+# Write all files of a recording. The video file has a hole unless compact is set.
+def write_recording(basepath: str, p: Programme, service: int, compact: bool) -> None:
+    unique = p.basename().encode("utf-8")
+    head, tail = ts_head(p.hd, unique), ts_tail(p.duration, unique)
+    size = len(head) + len(tail)
+    if not compact:
+        # The bit rate varies by up to 10 % between recordings
+        rate = BYTE_RATE[p.hd] * (900_000 + zlib.crc32(unique) % 200_001) // 1_000_000
+        size = max(size, p.duration * rate // TS_PACKET_SIZE * TS_PACKET_SIZE)
+    with open(basepath + E2_VIDEO_EXTENSION, "wb") as f:
+        f.write(head)
+        f.seek(size - len(tail))
+        f.write(tail)
+
+    service_type = 0x19 if p.hd else 0x01
+    with open(basepath + E2_META_EXTENSION, "w", encoding="utf-8") as f:
+        f.write(f"1:0:{service_type:X}:{service:X}:3FB:1:C00000:0:0:0::{p.channel}\n{p.title}\n{p.description}\n"
+                f"{int(p.start.timestamp())}\n\n{p.duration * 90_000}\n{size}\nf:0,c:00{service:04x}\n188\n0\n")
+
+    # Access points (file offset, PTS) once a minute, a receiver writes one per GOP
+    with open(basepath + E2_AP_EXTENSION, "wb") as f:
+        points = [(0, 0)] + [(minute * 60, size * minute * 60 // p.duration // TS_PACKET_SIZE * TS_PACKET_SIZE)
+                             for minute in range(1, p.duration // 60 + 1)] + [(p.duration, size - TS_PACKET_SIZE)]
+        f.write(b"".join(struct.pack(">QQ", offset, (PTS_START + second * 90_000) % (1 << 33)) for second, offset in points))
+
+    # Cut marks (PTS, type) of the padding before and after the programme: in, out and the last position
+    with open(basepath + ".ts.cuts", "wb") as f:
+        padding = min(300, p.duration // 10) * 90_000
+        f.write(struct.pack(">QIQIQI", PTS_START + padding, 0, PTS_START + p.duration * 90_000 - padding, 1, PTS_START, 3))
+
+    # Structure index (file offset, start code) of the sequence header
+    with open(basepath + ".ts.sc", "wb") as f:
+        f.write(struct.pack(">QQ", 2 * TS_PACKET_SIZE, 0x67 if p.hd else 0xb3))
+
+    with open(basepath + ".eit", "wb") as f:
+        f.write(eit_event(p))
+
+    mtime = (p.start + timedelta(seconds=p.duration)).timestamp()
+    for e in (E2_VIDEO_EXTENSION, E2_META_EXTENSION, E2_AP_EXTENSION, ".ts.cuts", ".ts.sc", ".eit"):
+        os.utime(basepath + e, (mtime, mtime))
+
+# Made up words, so that unrelated texts share as few character n-grams as real ones do
+def make_vocabulary(rng: random.Random) -> list[str]:
+    onsets, vowels, codas = SYLLABLES
+    return ["".join(rng.choice(onsets) + rng.choice(vowels) + rng.choice(codas) for _ in range(rng.randint(1, 4)))
+            for _ in range(VOCABULARY_SIZE)]
+
+def make_words(rng: random.Random, vocabulary: list[str], count: int) -> str:
+    return " ".join(rng.choice(WORDS) if rng.random() < 0.3 else rng.choice(vocabulary) for _ in range(count))
+
+# The programmes recorded: series episodes, movies re-broadcast a few times (sometimes under a slightly
+# different title), recordings overlapping by their timer padding and programmes split in two
+def make_programmes(count: int, rng: random.Random) -> list[Programme]:
+    vocabulary = make_vocabulary(rng)
+    series = [make_words(rng, vocabulary, 2).capitalize() for _ in range(max(1, count // 50))]
+    movies = [(make_words(rng, vocabulary, rng.randint(1, 4)).capitalize(),
+               make_words(rng, vocabulary, rng.randint(10, 60)).capitalize() + ".",
+               rng.randint(80, 150) * 60) for _ in range(max(1, count // 3))]
+    clocks = {c: datetime(2015, 1, 1) + timedelta(minutes=rng.randrange(60 * 24)) for c, _ in CHANNELS}
+    # Hours between recordings of a channel, so that even large archives span about ten years
+    gap_hours = max(2, min(72, 2 * 10 * 365 * 24 * len(CHANNELS) // count))
+
+    programmes = []
+    for i in range(count):
+        channel, hd = rng.choice(CHANNELS)
+        if rng.random() < 0.4:
+            title, duration = rng.choice(series), rng.choice((1500, 2700, 3000))
+            text = f"Folge {rng.randint(1, 300)}: {make_words(rng, vocabulary, rng.randint(10, 60)).capitalize()}."
+        else:
+            # Re-broadcasts share the description, but may have a different title or an addition to it
+            title, text, duration = rng.choice(movies)
+            duration += rng.randint(-3, 3) * 60
+            if rng.random() < 0.1:
+                title += rng.choice((" (HD)", " - Director's Cut", ": Teil 1"))
+            if rng.random() < 0.2:
+                text += " " + make_words(rng, vocabulary, rng.randint(3, 8)).capitalize() + "."
+
+        programmes.append(Programme(channel, hd, clocks[channel], duration, title, f"{title} {text}"))
+
+        gap = rng.random()
+        if gap < 0.1:
+            seconds = -rng.randint(1, 5) * 60
+        elif gap < 0.2:
+            seconds = 0
+        else:
+            seconds = rng.randint(1, gap_hours) * 3600
+        clocks[channel] += timedelta(seconds=duration + seconds)
+    return programmes
+
+# Build an archive of count recordings below root, spread over volumes directories with depth levels
+# of fanout subdirectories each, and a share of copies of recordings on another volume.
+# Returns the directories of the volumes.
+def generate_archive(root: str, count: int, depth: int = 2, fanout: int = 8, volumes: int = 2,
+                     copies: float = 0.02, compact: bool = False, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    volume_paths = [os.path.join(root, f"volume{v}") for v in range(volumes)]
+    services = {c: 0x2800 + i for i, (c, _) in enumerate(CHANNELS)}
+    directories = set()
+
+    for i, p in enumerate(make_programmes(count, rng)):
+        print(f"Writing recording {i + 1} of {count}", end="\r", file=sys.stderr)
+        leaf = rng.randrange(fanout ** depth)
+        subdirs = [f"group{(leaf // fanout ** level) % fanout}" for level in range(depth)]
+        targets = [rng.randrange(volumes)]
+        if volumes > 1 and rng.random() < copies:
+            targets.append((targets[0] + 1) % volumes)
+        for v in targets:
+            dirpath = os.path.join(volume_paths[v], *subdirs)
+            if dirpath not in directories:
+                os.makedirs(dirpath, exist_ok=True)
+                directories.add(dirpath)
+            write_recording(os.path.join(dirpath, p.basename()), p, services[p.channel], compact)
+
+    # Directories modified only now would be listed again on every scan (see DIR_MTIME_SLACK)
+    past = datetime(2024, 1, 1).timestamp()
+    for dirpath, _, _ in sorted(os.walk(root), reverse=True):
+        os.utime(dirpath, (past, past))
+
+    print(f"Successfully wrote {count} recordings to {root}.", file=sys.stderr)
+    return volume_paths
+
+def main(argc: int, argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog=argv[0])
+    parser.add_argument("root", help="directory to create the archive in")
+    parser.add_argument("-n", "--count", type=int, default=1000, help="number of recordings (default: 1000)")
+    parser.add_argument("--depth", type=int, default=2, help="levels of subdirectories below each volume (default: 2)")
+    parser.add_argument("--fanout", type=int, default=8, help="subdirectories per directory (default: 8)")
+    parser.add_argument("--volumes", type=int, default=2, help="number of volumes (default: 2)")
+    parser.add_argument("--copies", type=float, default=0.02,
+                        help="share of recordings copied to a second volume (default: 0.02)")
+    parser.add_argument("--compact", action="store_true",
+                        help="write only the packets of the video files, without a hole of their real size")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random archive (default: 0)")
+    args = parser.parse_args(argv[1:argc])
+
+    for path in generate_archive(args.root, args.count, args.depth, args.fanout, args.volumes,
+                                 args.copies, args.compact, args.seed):
+        print(path)
+
+if __name__ == "__main__":
+    main(len(sys.argv), sys.argv)
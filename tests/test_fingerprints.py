@@ -0,0 +1,40 @@
+import random
+
+import dvr_manager as dvr
+
+FRAMES = len(dvr.FINGERPRINT_OFFSETS)
+
+def random_frame(rng: random.Random) -> int:
+    # Half of the bits set, as in the hash of a frame with some detail
+    return sum(1 << b for b in rng.sample(range(64), 32))
+
+def fingerprint(frames: list[int]) -> bytes:
+    return b"".join(f.to_bytes(8, "big") for f in frames)
+
+# Flip one bit in each of the first count parts of the hash index, so that the frame only shares the other parts
+def flip(frame: int, count: int) -> int:
+    parts = dvr.FINGERPRINT_DISTANCE + 1
+    for i in range(count):
+        frame ^= 1 << (64 * i // parts)
+    return frame
+
+def test_frames_within_the_distance_are_grouped() -> None:
+    rng = random.Random(1)
+    original = [random_frame(rng) for _ in range(FRAMES)]
+    fingerprints = {f"other{i}": fingerprint([random_frame(rng) for _ in range(FRAMES)]) for i in range(50)}
+    fingerprints["a"] = fingerprint(original)
+    fingerprints["b"] = fingerprint([flip(f, dvr.FINGERPRINT_DISTANCE) for f in original])
+
+    assert dvr.fingerprint_clusters(fingerprints) == {"a": "a", "b": "a"}
+
+def test_frames_beyond_the_distance_are_not_grouped() -> None:
+    rng = random.Random(2)
+    original = [random_frame(rng) for _ in range(FRAMES)]
+    fingerprints = {"a": fingerprint(original), "b": fingerprint([flip(f, dvr.FINGERPRINT_DISTANCE + 1) for f in original])}
+
+    assert dvr.fingerprint_clusters(fingerprints) == {}
+
+def test_uniform_frames_are_ignored() -> None:
+    black = fingerprint([0] * FRAMES)
+
+    assert dvr.fingerprint_clusters({"a": black, "b": black}) == {}
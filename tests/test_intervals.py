@@ -0,0 +1,41 @@
+import dvr_manager as dvr
+
+def recording(basename: str, timestamp: str, duration: int, channel: str = "Das Erste HD") -> dvr.Recording:
+    rec = dvr.Recording()
+    rec.file_basename, rec.timestamp, rec.video_duration, rec.epg_channel = basename, timestamp, duration, channel
+    return rec
+
+def clusters(*recs: dvr.Recording) -> dict[str, str]:
+    index = dvr.IntervalIndex()
+    for rec in recs:
+        index.add(rec)
+    return index.clusters()
+
+def test_copies_are_no_overlap() -> None:
+    assert clusters(recording("a", "2023-05-01 20:15", 5400), recording("a", "2023-05-01 20:15", 5400)) == {}
+
+def test_copies_with_an_overlapping_recording_are_one_pair() -> None:
+    assert clusters(recording("a", "2023-05-01 20:15", 5400), recording("a", "2023-05-01 20:15", 5400),
+                    recording("b", "2023-05-01 21:30", 3600)) == {"a": "a", "b": "a"}
+
+def test_partial_overlap() -> None:
+    assert clusters(recording("a", "2023-05-01 20:15", 5400), recording("b", "2023-05-01 21:30", 3600)) == {"a": "a", "b": "a"}
+
+def test_touching_intervals_are_adjacent() -> None:
+    # The second recording starts OVERLAP_GAP seconds after the first one ended
+    assert clusters(recording("a", "2023-05-01 20:00", 3600 - dvr.OVERLAP_GAP),
+                    recording("b", "2023-05-01 21:00", 1800)) == {"a": "a", "b": "a"}
+
+def test_apart_or_on_other_channels() -> None:
+    assert clusters(recording("a", "2023-05-01 20:00", 1800), recording("b", "2023-05-01 21:00", 1800)) == {}
+    assert clusters(recording("a", "2023-05-01 20:15", 5400),
+                    recording("b", "2023-05-01 20:15", 5400, channel="ZDF HD")) == {}
+
+def test_removed_copy_leaves_the_others() -> None:
+    index = dvr.IntervalIndex()
+    a, b = recording("a", "2023-05-01 20:15", 5400), recording("b", "2023-05-01 21:30", 3600)
+    for rec in (a, recording("a", "2023-05-01 20:15", 5400), b):
+        index.add(rec)
+    assert index.clusters() == {"a": "a", "b": "a"}
+    index.remove(b)
+    assert index.clusters() == {}
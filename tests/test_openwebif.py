@@ -0,0 +1,62 @@
+import os
+
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import dvr_manager as dvr
+
+from openwebif_standin import StandInServer, serve
+from synthetic_archive import Programme, write_recording
+
+def add_recording(directory: Path, title: str) -> None:
+    p = Programme("ZDF HD", True, datetime(2023, 5, 1, 20, 15), 5400, title, "Text")
+    write_recording(os.path.join(directory, p.basename()), p, 1, True)
+
+@pytest.fixture
+def archive(tmp_path: Path) -> Path:
+    (tmp_path / "movie" / "series").mkdir(parents=True)
+    add_recording(tmp_path / "movie", "Titel")
+    return tmp_path / "movie"
+
+@pytest.fixture
+def server(archive: Path) -> Iterator[StandInServer]:
+    server = serve(str(archive))
+    yield server
+    server.shutdown()
+
+def test_first_fetch(archive: Path, server: StandInServer) -> None:
+    listed = dvr.fetch_movielist(dvr.ConnectionPool(server.url()), server.url() + str(archive), None)
+
+    assert listed is not None
+    subdirs, movies, validator = listed
+    assert subdirs == ["series"]
+    assert [m["eventname"] for m in movies] == ["Titel"]
+    assert validator.startswith('"')
+
+def test_unchanged_list_is_revalidated(archive: Path, server: StandInServer) -> None:
+    pool = dvr.ConnectionPool(server.url())
+    listed = dvr.fetch_movielist(pool, server.url() + str(archive), None)
+    assert listed is not None
+    cached = dvr.Directory(0, listed[0], [], listed[2])
+
+    assert dvr.fetch_movielist(pool, server.url() + str(archive), cached) is None
+    assert (server.requests, server.not_modified, server.connections) == (2, 1, 1)
+
+    add_recording(archive, "Neu")
+    changed = dvr.fetch_movielist(pool, server.url() + str(archive), cached)
+    assert changed is not None
+    assert sorted(m["eventname"] for m in changed[1]) == ["Neu", "Titel"]
+    assert changed[2] != cached.validator
+
+def test_connection_dropped_by_the_receiver_is_reopened(archive: Path) -> None:
+    server = serve(str(archive), keep_alive=1)
+    try:
+        pool = dvr.ConnectionPool(server.url())
+        for _ in range(3):
+            assert dvr.fetch_movielist(pool, server.url() + str(archive), None) is not None
+        assert (server.requests, server.connections) == (3, 3)
+    finally:
+        server.shutdown()
@@ -0,0 +1,76 @@
+import os
+
+from datetime import datetime
+from pathlib import Path
+
+import dvr_manager as dvr
+
+from synthetic_archive import (NULL_PID, PTS_START, VIDEO_PID, BitWriter, Programme, h264_sps, ts_head, ts_packet,
+                               ts_tail, write_recording)
+
+def unescape(nal: bytes) -> bytes:
+    return nal.replace(b"\x00\x00\x03", b"\x00\x00")
+
+# H.265 Main profile SPS up to the conformance window, which is all the prober reads
+def h265_sps(width: int, height: int) -> bytes:
+    b = BitWriter()
+    b.u(4, 0)
+    b.u(3, 0)
+    b.u(1, 1)
+    b.u(96, 0)
+    b.ue(0)
+    b.ue(1)
+    coded_height = (height + 15) // 16 * 16
+    b.ue(width)
+    b.ue(coded_height)
+    b.u(1, coded_height != height)
+    if coded_height != height:
+        for value in (0, 0, 0, (coded_height - height) // 2):
+            b.ue(value)
+    return b"\x42\x01" + b.nal_payload()
+
+def write_video(path: str, data: bytes) -> str:
+    with open(path + dvr.E2_VIDEO_EXTENSION, "wb") as f:
+        f.write(data)
+    return path
+
+def test_h264_sps() -> None:
+    assert dvr.parse_h264_sps(unescape(h264_sps(1920, 1080, 25)[4:])) == (1080, 1920, 25)
+    assert dvr.parse_h264_sps(unescape(h264_sps(1280, 720, 50)[4:])) == (720, 1280, 50)
+
+def test_h265_sps() -> None:
+    assert dvr.parse_h265_sps(unescape(h265_sps(3840, 2160))) == (2160, 3840, -1)
+    assert dvr.parse_h265_sps(unescape(h265_sps(1920, 1080))) == (1080, 1920, -1)
+
+def test_head_of_an_hd_recording(tmp_path: Path) -> None:
+    path = write_video(os.path.join(tmp_path, "hd"), ts_head(True, b"hd") + ts_tail(60, b"hd"))
+    with open(path + dvr.E2_VIDEO_EXTENSION, "rb") as f, dvr.mmap.mmap(f.fileno(), 0, access=dvr.mmap.ACCESS_READ) as m:
+        assert dvr.ts_probe_head(m, dvr.ts_sync_offset(m)) == (VIDEO_PID, (True, PTS_START), 1080, 1920, 25)
+
+def test_head_of_an_sd_recording(tmp_path: Path) -> None:
+    path = write_video(os.path.join(tmp_path, "sd"), ts_head(False, b"sd") + ts_tail(60, b"sd"))
+    with open(path + dvr.E2_VIDEO_EXTENSION, "rb") as f, dvr.mmap.mmap(f.fileno(), 0, access=dvr.mmap.ACCESS_READ) as m:
+        assert dvr.ts_probe_head(m, dvr.ts_sync_offset(m)) == (VIDEO_PID, (True, PTS_START), 576, 720, 25)
+
+def test_access_points_duration(tmp_path: Path) -> None:
+    path = os.path.join(tmp_path, "recording")
+    write_recording(path, Programme("ZDF HD", True, datetime(2023, 5, 1, 20, 15), 5400, "Titel", "Text"), 1, True)
+
+    assert dvr.read_access_points_duration(path + dvr.E2_AP_EXTENSION) == 5400
+    assert dvr.read_access_points_duration(path + ".missing") == -1
+
+def test_duration_from_the_last_pcr(tmp_path: Path) -> None:
+    path = write_video(os.path.join(tmp_path, "pcr"), ts_head(True, b"pcr") + ts_tail(2700, b"pcr"))
+
+    assert dvr.probe_transport_stream(path) == (2700, 1080, 1920, 25)
+
+def test_tail_search_is_limited(tmp_path: Path) -> None:
+    head, null = ts_head(True, b"tail"), ts_packet(NULL_PID, b"")
+    pcr = ts_packet(VIDEO_PID, b"", pcr=PTS_START + 600 * 90_000)
+
+    # A timestamp just within the searched bytes is found, one just before them is not
+    within = write_video(os.path.join(tmp_path, "within"), head + pcr + null * (dvr.TS_TAIL_SCAN // dvr.TS_PACKET_SIZE - 1))
+    beyond = write_video(os.path.join(tmp_path, "beyond"), head + pcr + null * (dvr.TS_TAIL_SCAN // dvr.TS_PACKET_SIZE))
+
+    assert dvr.probe_transport_stream(within)[0] == 600
+    assert dvr.probe_transport_stream(beyond) == (-1, 1080, 1920, 25)
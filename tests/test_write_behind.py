@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import dvr_manager as dvr
+
+BASEPATH = "/media/hdd/movie/20230501 2015 - ZDF HD - Titel"
+
+def recording(size: int) -> dvr.Recording:
+    return dvr.RecordingFactory.from_movielist(BASEPATH, {"filesize": size, "recordingtime": 1682964900,
+                                                          "servicename": "ZDF HD", "eventname": "Titel", "length": "90:00"})
+
+def test_queued_change_keeps_what_the_loader_saved(tmp_path: Path) -> None:
+    dvr.db_init(str(tmp_path / "recordings.sqlite3"))
+    queue = dvr.WriteBehindQueue(60)
+    old = recording(1000)
+    dvr.db_save([old])
+
+    old.is_good, old.comment = True, "Gut"
+    queue.put([old])
+    # The loader found the recording grown and replaced it before the change was written
+    dvr.db_save([recording(2000)])
+    queue.flush()
+
+    rec = dvr.db_load_all()[BASEPATH]
+    assert (rec.file_size, rec.is_good, rec.comment) == (2000, True, "Gut")
+
+def test_change_of_an_uncached_recording_is_saved_whole(tmp_path: Path) -> None:
+    dvr.db_init(str(tmp_path / "recordings.sqlite3"))
+    rec = recording(1000)
+
+    rec.is_dropped = True
+    dvr.WriteBehindQueue(0).put([rec])
+
+    cached = dvr.db_load_all()[BASEPATH]
+    assert (cached.file_size, cached.epg_title, cached.is_dropped) == (1000, "Titel", True)